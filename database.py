@@ -6,6 +6,8 @@ from datetime import datetime
 class Database:
     def __init__(self, db_name='meat_house.db'):
         self.conn = sqlite3.connect(db_name)
+        # SQLite не проверяет внешние ключи, пока это не включено явно
+        self.conn.execute('PRAGMA foreign_keys = ON')
         self.create_tables()
 
     def create_tables(self):
@@ -16,10 +18,16 @@ class Database:
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
             price REAL NOT NULL,
-            stock INTEGER DEFAULT 0
+            stock INTEGER DEFAULT 0,
+            active INTEGER NOT NULL DEFAULT 1
         )
         ''')
 
+        # Базы, созданные до появления архива товаров, получают столбец active
+        cursor.execute('PRAGMA table_info(products)')
+        if 'active' not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE products ADD COLUMN active INTEGER NOT NULL DEFAULT 1')
+
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS raw_materials (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -48,6 +56,26 @@ class Database:
         )
         ''')
 
+        # Индекс для списков товаров и отчета по остаткам: архивные товары
+        # не просматриваются. stock в индекс не входит, чтобы продажи и
+        # производство не обновляли его при каждой записи
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_products_active
+        ON products (active)
+        ''')
+
+        # Индексы для отчетов: выборка по диапазону дат идет по индексу,
+        # а product_id и quantity берутся из него же без обращения к таблице
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sales_date
+        ON sales (sale_date, product_id, quantity)
+        ''')
+
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_production_date
+        ON production (production_date, product_id, quantity)
+        ''')
+
         self.conn.commit()
 
     # Товары
@@ -58,19 +86,47 @@ class Database:
         self.conn.commit()
         return cursor.lastrowid
 
-    def get_products(self):
+    def get_products(self, include_archived=False):
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM products')
+        if include_archived:
+            cursor.execute('SELECT id, name, price, stock FROM products ORDER BY id')
+        else:
+            cursor.execute('SELECT id, name, price, stock FROM products WHERE active = 1 ORDER BY id')
         return cursor.fetchall()
 
     def delete_product(self, product_id):
+        # Товар переносится в архив: записи о продажах и производстве
+        # продолжают на него ссылаться и остаются в отчетах
         cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM products WHERE id = ?', (product_id,))
+        cursor.execute('UPDATE products SET active = 0 WHERE id = ?', (product_id,))
         self.conn.commit()
 
+    def purge_archived_products(self):
+        # Окончательно удаляются только архивные товары без истории
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        DELETE FROM products
+        WHERE active = 0
+          AND NOT EXISTS (SELECT 1 FROM sales s WHERE s.product_id = products.id)
+          AND NOT EXISTS (SELECT 1 FROM production p WHERE p.product_id = products.id)
+        ''')
+        self.conn.commit()
+        return cursor.rowcount
+
+    def _check_product_active(self, cursor, product_id):
+        cursor.execute('SELECT active FROM products WHERE id = ?', (product_id,))
+        row = cursor.fetchone()
+
+        if row is None:
+            raise ValueError("Товар не найден")
+        if not row[0]:
+            raise ValueError("Товар находится в архиве")
+
     # Производство
     def add_production(self, product_id, quantity, production_date):
         cursor = self.conn.cursor()
+        self._check_product_active(cursor, product_id)
+
         cursor.execute('''
         INSERT INTO production (product_id, quantity, production_date)
         VALUES (?, ?, ?)
@@ -107,6 +163,8 @@ class Database:
     def add_sale(self, product_id, quantity, sale_date):
         cursor = self.conn.cursor()
 
+        self._check_product_active(cursor, product_id)
+
         cursor.execute('SELECT stock FROM products WHERE id = ?', (product_id,))
         stock = cursor.fetchone()[0]
 
@@ -148,7 +206,7 @@ class Database:
     # Отчеты
     def get_stock_report(self):
         cursor = self.conn.cursor()
-        cursor.execute('SELECT id, name, stock, price FROM products')
+        cursor.execute('SELECT id, name, stock, price FROM products WHERE active = 1 ORDER BY id')
         return cursor.fetchall()
 
     def update_product(self, product_id, name, price, stock):
@@ -3,12 +3,36 @@ from datetime import datetime
 from database import Database  # Импорт класса Database для работы с базой данных
 
 
+# Выражения SQLite, приводящие дату к началу интервала группировки,
+# и шаг, с которым перебираются интервалы
+BUCKETS = {
+    'day': ("date({0})", '+1 day'),
+    'week': ("date({0}, '-' || ((strftime('%w', {0}) + 6) % 7) || ' days')", '+7 days'),
+    'month': ("date({0}, 'start of month')", '+1 month'),
+    'quarter': ("date({0}, 'start of month', "
+                "'-' || ((strftime('%m', {0}) - 1) % 3) || ' months')", '+3 months'),
+}
+
+# Таблицы, по которым строятся ряды: (таблица, столбец с датой)
+SERIES_SOURCES = {
+    'sales': ('sales', 'sale_date'),
+    'production': ('production', 'production_date'),
+}
+
+
 class Reports:
     """Класс для генерации различных отчетов предприятия"""
 
-    def __init__(self):
-        """Инициализация объекта Reports с подключением к базе данных"""
-        self.db = Database()  # Создаем экземпляр Database для работы с БД
+    def __init__(self, db=None):
+        """
+        Инициализация объекта Reports с подключением к базе данных
+
+        Args:
+            db (Database): Уже открытое подключение (например, из окна
+                приложения). Если не передано, создается новое.
+        """
+        # Создаем экземпляр Database для работы с БД, если он не передан
+        self.db = db if db is not None else Database()
 
     def sales_report(self, start_date, end_date):
         """
@@ -49,8 +73,8 @@ class Reports:
         """
         cursor = self.db.conn.cursor()
 
-        # Получаем остатки готовой продукции
-        cursor.execute('SELECT name, stock FROM products')
+        # Получаем остатки готовой продукции (без архивных товаров)
+        cursor.execute('SELECT name, stock FROM products WHERE active = 1 ORDER BY id')
         products = cursor.fetchall()
 
         # Получаем остатки сырья
@@ -88,4 +112,174 @@ class Reports:
         ''', (start_date, end_date))
 
         report = cursor.fetchall()  # Получаем все строки результата запроса
-        return report
\ No newline at end of file
+        return report
+
+    def dashboard_report(self, start_date, end_date, top_n=5):
+        """
+        Сводный отчет за период: продажи, производство и остатки
+
+        Все показатели считаются одним SQL-запросом, поэтому они относятся
+        к одному и тому же состоянию базы данных. Продажи и производство
+        выбираются по индексам дат за один проход по каждой таблице,
+        места в рейтингах вычисляются оконными функциями.
+
+        Args:
+            start_date (str): Начальная дата периода в формате 'YYYY-MM-DD'
+            end_date (str): Конечная дата периода в формате 'YYYY-MM-DD'
+            top_n (int): Количество товаров в рейтингах
+
+        Returns:
+            dict: Словарь с ключами:
+                  - 'rows': список кортежей по каждому товару
+                    (id, название, продано, выручка, произведено,
+                    изменение остатка, текущий остаток,
+                    место по выручке, место по количеству)
+                  - 'top_revenue': первые top_n строк по выручке
+                  - 'top_quantity': первые top_n строк по количеству
+        """
+        cursor = self.db.conn.cursor()
+        # SQL-запрос для сводного отчета:
+        # - Продажи и производство суммируются по товарам за период
+        # - Товары без движения попадают в отчет с нулями (LEFT JOIN),
+        #   архивные товары - только если по ним было движение за период,
+        #   их остаток не учитывается, как и в отчете по остаткам
+        # - Изменение остатка = произведено - продано
+        # - Места в рейтингах считаются через RANK()
+        cursor.execute('''
+        WITH sold AS (
+            SELECT product_id, SUM(quantity) AS quantity
+            FROM sales
+            WHERE sale_date BETWEEN ? AND ?
+            GROUP BY product_id
+        ),
+        produced AS (
+            SELECT product_id, SUM(quantity) AS quantity
+            FROM production
+            WHERE production_date BETWEEN ? AND ?
+            GROUP BY product_id
+        ),
+        totals AS (
+            SELECT p.id, p.name,
+                   COALESCE(s.quantity, 0) AS sold,
+                   COALESCE(s.quantity, 0) * p.price AS revenue,
+                   COALESCE(pr.quantity, 0) AS produced,
+                   COALESCE(pr.quantity, 0) - COALESCE(s.quantity, 0) AS net_change,
+                   CASE WHEN p.active = 1 THEN p.stock ELSE 0 END AS stock
+            FROM products p
+            LEFT JOIN sold s ON s.product_id = p.id
+            LEFT JOIN produced pr ON pr.product_id = p.id
+            WHERE p.active = 1
+               OR s.product_id IS NOT NULL
+               OR pr.product_id IS NOT NULL
+        )
+        SELECT id, name, sold, revenue, produced, net_change, stock,
+               RANK() OVER (ORDER BY revenue DESC),
+               RANK() OVER (ORDER BY sold DESC)
+        FROM totals
+        ORDER BY revenue DESC, name
+        ''', (start_date, end_date, start_date, end_date))
+
+        rows = cursor.fetchall()  # Получаем все строки результата запроса
+
+        # В рейтинги попадают только товары, которые продавались за период
+        top_revenue = [row for row in rows if row[2] > 0][:top_n]
+        top_quantity = sorted((row for row in rows if row[2] > 0),
+                              key=lambda row: row[8])[:top_n]
+
+        return {
+            'rows': rows,
+            'top_revenue': top_revenue,
+            'top_quantity': top_quantity
+        }
+
+    def bucketed_report(self, start_date, end_date, bucket='day', source='sales', max_points=None):
+        """
+        Генерация временных рядов по товарам с группировкой по интервалам
+
+        Продажи или производство суммируются по интервалам (день, неделя ISO,
+        месяц, квартал) прямо в SQL. Ряды плотные: интервалы без движения
+        возвращаются с нулевым количеством. Если задан max_points и
+        интервалов больше, соседние интервалы объединяются так, чтобы
+        в каждом ряду было ровно max_points точек. Группы могут
+        отличаться на один интервал, поэтому вместе с суммой
+        возвращается число интервалов в группе: по нему график
+        вычисляет среднее за интервал, а сумма по ряду остается равной
+        итогу за период.
+
+        Args:
+            start_date (str): Начальная дата периода в формате 'YYYY-MM-DD'
+            end_date (str): Конечная дата периода в формате 'YYYY-MM-DD'
+            bucket (str): Интервал группировки: 'day', 'week', 'month', 'quarter'
+            source (str): Источник данных: 'sales' или 'production'
+            max_points (int): Максимальное количество точек в ряду
+
+        Returns:
+            dict: Словарь {(id товара, название товара): список кортежей
+                  (начало группы, общее количество, число интервалов)}
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Неизвестный интервал группировки: {bucket}")
+        if source not in SERIES_SOURCES:
+            raise ValueError(f"Неизвестный источник данных: {source}")
+        if max_points is not None and max_points < 1:
+            raise ValueError(f"Количество точек должно быть положительным: {max_points}")
+
+        bucket_expr, step = BUCKETS[bucket]
+        table, date_column = SERIES_SOURCES[source]
+
+        cursor = self.db.conn.cursor()
+        # SQL-запрос для получения временных рядов:
+        # - Рекурсивно перебираются все интервалы периода
+        # - При превышении max_points интервалы распределяются
+        #   по max_points группам
+        # - Количество суммируется по товарам и группам, число интервалов
+        #   в группе возвращается вместе с суммой
+        # - Для каждого товара с движением за период строится полный ряд
+        cursor.execute(f'''
+        WITH RECURSIVE period(start_date, end_date, max_points) AS (
+            SELECT ?, ?, ?
+        ),
+        buckets(start) AS (
+            SELECT {bucket_expr.format('start_date')} FROM period
+            UNION ALL
+            SELECT date(start, '{step}') FROM buckets, period
+            WHERE date(start, '{step}') <= end_date
+        ),
+        numbered AS (
+            SELECT start,
+                   ROW_NUMBER() OVER (ORDER BY start) - 1 AS idx,
+                   COUNT(*) OVER () AS total
+            FROM buckets
+        ),
+        groups AS (
+            SELECT start,
+                   CASE WHEN max_points IS NULL OR total <= max_points THEN idx
+                        ELSE idx * max_points / total END AS grp
+            FROM numbered, period
+        ),
+        points AS (
+            SELECT grp, MIN(start) AS start
+            FROM groups
+            GROUP BY grp
+        ),
+        data AS (
+            SELECT product_id, {bucket_expr.format(date_column)} AS start,
+                   SUM(quantity) AS quantity
+            FROM {table}
+            WHERE {date_column} BETWEEN ? AND ?
+            GROUP BY product_id, 2
+        )
+        SELECT p.id, p.name, pt.start, COALESCE(SUM(d.quantity), 0), COUNT(*)
+        FROM (SELECT DISTINCT product_id FROM data) a
+        JOIN products p ON p.id = a.product_id
+        CROSS JOIN points pt
+        JOIN groups g ON g.grp = pt.grp
+        LEFT JOIN data d ON d.product_id = a.product_id AND d.start = g.start
+        GROUP BY a.product_id, pt.grp
+        ORDER BY p.name, p.id, pt.start
+        ''', (start_date, end_date, max_points, start_date, end_date))
+
+        report = {}
+        for product_id, name, start, quantity, buckets in cursor.fetchall():
+            report.setdefault((product_id, name), []).append((start, quantity, buckets))
+        return report
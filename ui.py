@@ -4,14 +4,84 @@ from PyQt5.QtWidgets import (QMainWindow, QApplication, QTabWidget, QWidget,
                              QTableWidgetItem, QLabel, QLineEdit, QDateEdit,
                              QComboBox, QSpinBox, QMessageBox, QFormLayout,
                              QHeaderView)
-from PyQt5.QtCore import QDate
+from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtGui import QColor, QPainter, QPen
 from database import Database
+from reports import Reports
+
+
+# Максимальное количество точек в ряду графика
+CHART_POINTS = 300
+
+
+class ChartWidget(QWidget):
+    """
+    Простой линейный график рядов из Reports.bucketed_report
+
+    Ряды: {(id товара, название): [(подпись, количество, число интервалов), ...]}.
+    Для каждой точки рисуется среднее количество за один интервал.
+    """
+
+    COLORS = [Qt.blue, Qt.red, Qt.darkGreen, Qt.magenta, Qt.darkYellow, Qt.darkCyan, Qt.black]
+
+    def __init__(self):
+        super().__init__()
+        self.series = {}
+        self.setMinimumHeight(250)
+
+    def set_series(self, series):
+        self.series = series
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), Qt.white)
+
+        if not self.series:
+            painter.drawText(self.rect(), Qt.AlignCenter, "Нет данных за выбранный период")
+            return
+
+        # Область построения с отступами под подписи осей
+        left, top = 50, 10
+        width = self.width() - left - 150
+        height = self.height() - top - 30
+        series = {f"{name} (ID {product_id})": [(start, quantity / buckets) for start, quantity, buckets in values]
+                  for (product_id, name), values in self.series.items()}
+        points = max(len(values) for values in series.values())
+        max_value = max(max(value for _, value in values) for values in series.values()) or 1
+
+        painter.setPen(QPen(Qt.gray))
+        painter.drawLine(left, top + height, left + width, top + height)
+        painter.drawLine(left, top, left, top + height)
+        painter.drawText(5, top + 10, f"{max_value:g}")
+        painter.drawText(5, top + height, "0")
+
+        labels = next(iter(series.values()))
+        painter.drawText(left, top + height + 20, labels[0][0])
+        painter.drawText(left + width - 70, top + height + 20, labels[-1][0])
+
+        for index, (name, values) in enumerate(series.items()):
+            color = QColor(self.COLORS[index % len(self.COLORS)])
+            painter.setPen(QPen(color, 2))
+
+            step = width / max(points - 1, 1)
+            previous = None
+            for i, (_, value) in enumerate(values):
+                point = (int(left + i * step), int(top + height - value * height / max_value))
+                if previous is not None:
+                    painter.drawLine(previous[0], previous[1], point[0], point[1])
+                previous = point
+
+            # Легенда справа от графика
+            painter.drawText(left + width + 10, top + 15 + index * 18, name)
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.db = Database()
+        self.reports = Reports(self.db)
         self.setWindowTitle('Учет производства и продаж - ООО "Мясной дом"')
         self.setGeometry(100, 100, 800, 600)
 
@@ -64,9 +134,12 @@ class MainWindow(QMainWindow):
         save_btn = QPushButton("Сохранить изменения")
         save_btn.clicked.connect(self.save_product_changes)
 
-        delete_btn = QPushButton("Удалить выбранный")
+        delete_btn = QPushButton("В архив")
         delete_btn.clicked.connect(self.delete_product)
 
+        purge_btn = QPushButton("Очистить архив")
+        purge_btn.clicked.connect(self.purge_archived_products)
+
         form_layout.addWidget(self.product_name)
         form_layout.addWidget(self.product_price)
         form_layout.addWidget(QLabel("Количество:"))
@@ -74,6 +147,7 @@ class MainWindow(QMainWindow):
         form_layout.addWidget(add_btn)
         form_layout.addWidget(save_btn)
         form_layout.addWidget(delete_btn)
+        form_layout.addWidget(purge_btn)
 
         # Таблица товаров
         self.products_table = QTableWidget()
@@ -246,6 +320,13 @@ class MainWindow(QMainWindow):
         stock_report_btn = QPushButton("Отчет по остаткам")
         stock_report_btn.clicked.connect(self.generate_stock_report)
 
+        dashboard_report_btn = QPushButton("Сводный отчет")
+        dashboard_report_btn.clicked.connect(self.generate_dashboard_report)
+
+        self.report_top_n = QSpinBox()
+        self.report_top_n.setMinimum(1)
+        self.report_top_n.setValue(5)
+
         period_layout.addWidget(QLabel("С:"))
         period_layout.addWidget(self.report_start_date)
         period_layout.addWidget(QLabel("По:"))
@@ -253,6 +334,32 @@ class MainWindow(QMainWindow):
         period_layout.addWidget(sales_report_btn)
         period_layout.addWidget(production_report_btn)
         period_layout.addWidget(stock_report_btn)
+        period_layout.addWidget(dashboard_report_btn)
+        period_layout.addWidget(QLabel("Топ:"))
+        period_layout.addWidget(self.report_top_n)
+
+        # Форма выбора параметров графика
+        chart_layout = QHBoxLayout()
+
+        self.report_bucket = QComboBox()
+        self.report_bucket.addItem("День", 'day')
+        self.report_bucket.addItem("Неделя", 'week')
+        self.report_bucket.addItem("Месяц", 'month')
+        self.report_bucket.addItem("Квартал", 'quarter')
+
+        self.report_source = QComboBox()
+        self.report_source.addItem("Продажи", 'sales')
+        self.report_source.addItem("Производство", 'production')
+
+        chart_report_btn = QPushButton("График")
+        chart_report_btn.clicked.connect(self.generate_chart_report)
+
+        chart_layout.addWidget(QLabel("Интервал:"))
+        chart_layout.addWidget(self.report_bucket)
+        chart_layout.addWidget(QLabel("Данные:"))
+        chart_layout.addWidget(self.report_source)
+        chart_layout.addWidget(chart_report_btn)
+        chart_layout.addStretch()
 
         # Таблица отчетов
         self.report_table = QTableWidget()
@@ -260,8 +367,14 @@ class MainWindow(QMainWindow):
         self.report_table.setHorizontalHeaderLabels(["Тип", "Название", "Количество", "Сумма", "Дата"])
         self.report_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
+        # График (показывается только для отчета "График")
+        self.report_chart = ChartWidget()
+        self.report_chart.hide()
+
         layout.addLayout(period_layout)
+        layout.addLayout(chart_layout)
         layout.addWidget(self.report_table)
+        layout.addWidget(self.report_chart)
 
         self.reports_tab.setLayout(layout)
 
@@ -292,13 +405,14 @@ class MainWindow(QMainWindow):
     def delete_product(self):
         selected = self.products_table.currentRow()
         if selected == -1:
-            QMessageBox.warning(self, "Ошибка", "Выберите товар для удаления")
+            QMessageBox.warning(self, "Ошибка", "Выберите товар для переноса в архив")
             return
 
         product_id = int(self.products_table.item(selected, 0).text())
 
         reply = QMessageBox.question(self, 'Подтверждение',
-                                     'Вы действительно хотите удалить этот товар?',
+                                     'Перенести этот товар в архив?\n'
+                                     'История продаж и производства сохранится в отчетах.',
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
@@ -309,6 +423,19 @@ class MainWindow(QMainWindow):
             self.update_production_table()
             self.update_sales_table()
 
+    def purge_archived_products(self):
+        reply = QMessageBox.question(self, 'Подтверждение',
+                                     'Окончательно удалить архивные товары без продаж и производства?\n'
+                                     'Товары с историей останутся в архиве.',
+                                     QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+
+        if reply == QMessageBox.Yes:
+            try:
+                count = self.db.purge_archived_products()
+                QMessageBox.information(self, "Успех", f"Удалено товаров: {count}")
+            except Exception as e:
+                QMessageBox.warning(self, "Ошибка", f"Не удалось очистить архив: {str(e)}")
+
     def update_products_table(self):
         products = self.db.get_products()
         self.products_table.setRowCount(len(products))
@@ -389,6 +516,8 @@ class MainWindow(QMainWindow):
         start_date = self.report_start_date.date().toString("yyyy-MM-dd")
         end_date = self.report_end_date.date().toString("yyyy-MM-dd")
 
+        self.report_chart.hide()
+
         try:
             sales = self.db.get_sales_by_period(start_date, end_date)
             self.report_table.setRowCount(len(sales))
@@ -415,6 +544,8 @@ class MainWindow(QMainWindow):
         start_date = self.report_start_date.date().toString("yyyy-MM-dd")
         end_date = self.report_end_date.date().toString("yyyy-MM-dd")
 
+        self.report_chart.hide()
+
         try:
             production = self.db.get_production_by_period(start_date, end_date)
             self.report_table.setRowCount(len(production))
@@ -436,6 +567,8 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Ошибка", f"Ошибка при формировании отчета: {str(e)}")
 
     def generate_stock_report(self):
+        self.report_chart.hide()
+
         try:
             stock = self.db.get_stock_report()
             self.report_table.setRowCount(len(stock))
@@ -458,4 +591,76 @@ class MainWindow(QMainWindow):
             self.report_table.setItem(self.report_table.rowCount() - 1, 4, QTableWidgetItem(str(total_amount)))
 
         except Exception as e:
-            QMessageBox.warning(self, "Ошибка", f"Ошибка при формировании отчета: {str(e)}")
\ No newline at end of file
+            QMessageBox.warning(self, "Ошибка", f"Ошибка при формировании отчета: {str(e)}")
+
+    def generate_dashboard_report(self):
+        start_date = self.report_start_date.date().toString("yyyy-MM-dd")
+        end_date = self.report_end_date.date().toString("yyyy-MM-dd")
+        top_n = self.report_top_n.value()
+
+        self.report_chart.hide()
+
+        try:
+            dashboard = self.reports.dashboard_report(start_date, end_date, top_n)
+            rows = dashboard['rows']
+            self.report_table.setRowCount(len(rows))
+            self.report_table.setColumnCount(9)
+            self.report_table.setHorizontalHeaderLabels(["ID", "Товар", "Продано", "Выручка", "Произведено",
+                                                         "Изменение", "Остаток", "Место (выручка)",
+                                                         "Место (кол-во)"])
+
+            for row, item in enumerate(rows):
+                for col in range(9):
+                    self.report_table.setItem(row, col, QTableWidgetItem(str(item[col])))
+
+            # Добавляем итоговую строку
+            total_sold = sum(item[2] for item in rows)
+            total_revenue = sum(item[3] for item in rows)
+            total_produced = sum(item[4] for item in rows)
+            total_change = sum(item[5] for item in rows)
+            total_stock = sum(item[6] for item in rows)
+
+            self.report_table.setRowCount(self.report_table.rowCount() + 1)
+            last_row = self.report_table.rowCount() - 1
+            self.report_table.setItem(last_row, 1, QTableWidgetItem("ИТОГО:"))
+            self.report_table.setItem(last_row, 2, QTableWidgetItem(str(total_sold)))
+            self.report_table.setItem(last_row, 3, QTableWidgetItem(str(total_revenue)))
+            self.report_table.setItem(last_row, 4, QTableWidgetItem(str(total_produced)))
+            self.report_table.setItem(last_row, 5, QTableWidgetItem(str(total_change)))
+            self.report_table.setItem(last_row, 6, QTableWidgetItem(str(total_stock)))
+
+            # Добавляем строки с рейтингами
+            for title, top in (("Топ по выручке:", dashboard['top_revenue']),
+                               ("Топ по количеству:", dashboard['top_quantity'])):
+                self.report_table.setRowCount(self.report_table.rowCount() + 1)
+                last_row = self.report_table.rowCount() - 1
+                self.report_table.setItem(last_row, 1, QTableWidgetItem(title))
+                self.report_table.setItem(last_row, 2, QTableWidgetItem(
+                    ", ".join(f"{item[1]} (ID {item[0]})" for item in top)))
+
+        except Exception as e:
+            QMessageBox.warning(self, "Ошибка", f"Ошибка при формировании отчета: {str(e)}")
+
+    def generate_chart_report(self):
+        start_date = self.report_start_date.date().toString("yyyy-MM-dd")
+        end_date = self.report_end_date.date().toString("yyyy-MM-dd")
+        bucket = self.report_bucket.currentData()
+        source = self.report_source.currentData()
+
+        try:
+            series = self.reports.bucketed_report(start_date, end_date, bucket, source, CHART_POINTS)
+            rows = [(product_id, name) + point for (product_id, name), values in series.items() for point in values]
+            self.report_table.setRowCount(len(rows))
+            self.report_table.setColumnCount(5)
+            self.report_table.setHorizontalHeaderLabels(["ID", "Товар", "Начало интервала", "Количество",
+                                                         "Число интервалов"])
+
+            for row, item in enumerate(rows):
+                for col in range(5):
+                    self.report_table.setItem(row, col, QTableWidgetItem(str(item[col])))
+
+            self.report_chart.set_series(series)
+            self.report_chart.show()
+
+        except Exception as e:
+            QMessageBox.warning(self, "Ошибка", f"Ошибка при формировании отчета: {str(e)}")